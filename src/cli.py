@@ -5,8 +5,6 @@ Main command-line interface for AD forest management
 """
 
 import click
-import yaml
-import json
 import os
 import sys
 from pathlib import Path
@@ -14,6 +12,9 @@ from pathlib import Path
 # Add current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import fs_utils
+import log_utils
+
 @click.group()
 @click.version_option(version='1.0.0', prog_name='AD-Setup Enterprise')
 def cli():
@@ -23,6 +24,9 @@ def cli():
 @cli.command()
 def configure():
     """Configure AD-Setup with your credentials and preferences"""
+    # Imported here so other commands and --help don't pay for PyYAML
+    import yaml_utils
+    
     click.echo("🔧 AD-Setup Configuration Wizard")
     click.echo("=" * 40)
     
@@ -51,7 +55,7 @@ def configure():
     
     cred_file = config_dir / "credentials.yaml"
     with open(cred_file, 'w') as f:
-        yaml.dump(credentials, f)
+        yaml_utils.dump(credentials, f)
     
     # Secure the file
     os.chmod(cred_file, 0o600)
@@ -94,53 +98,54 @@ def deploy_multi(primary, secondary, trust_type):
 @cli.command()
 def status():
     """Check the status of AD forests"""
+    import json
+    
     click.echo("📊 AD Forest Status")
     click.echo("=" * 60)
     
     # Check if daemon is running
-    status_file = Path.home() / ".ad-setup" / "status.json"
+    status_file = fs_utils.STATUS_FILE
     
-    if status_file.exists():
-        try:
-            with open(status_file, 'r') as f:
-                status = json.load(f)
-            
-            # Display daemon status
-            daemon_info = status.get('daemon', {})
-            click.echo("🔧 Daemon Status:")
-            click.echo(f"   PID: {daemon_info.get('pid', 'Unknown')}")
-            click.echo(f"   Uptime: {daemon_info.get('uptime', 0)} seconds")
-            click.echo(f"   Health Checks: {daemon_info.get('health_checks', 0)}")
-            click.echo(f"   Last Check: {status.get('timestamp', 'Unknown')}")
-            
-            # Display Docker status
-            click.echo("\n🐳 Docker Status:")
-            docker_status = "✅ Running" if status.get('docker', False) else "❌ Not Running"
-            click.echo(f"   {docker_status}")
-            
-            # Display forest status
-            forests = status.get('forests', {})
-            click.echo(f"\n🌲 Active Forests: {len(forests)}")
+    try:
+        with open(status_file, 'r') as f:
+            status = json.load(f)
+        
+        # Display daemon status
+        daemon_info = status.get('daemon', {})
+        click.echo("🔧 Daemon Status:")
+        click.echo(f"   PID: {daemon_info.get('pid', 'Unknown')}")
+        click.echo(f"   Uptime: {daemon_info.get('uptime', 0)} seconds")
+        click.echo(f"   Health Checks: {daemon_info.get('health_checks', 0)}")
+        click.echo(f"   Last Check: {status.get('timestamp', 'Unknown')}")
+        
+        # Display Docker status
+        click.echo("\n🐳 Docker Status:")
+        docker_status = "✅ Running" if status.get('docker', False) else "❌ Not Running"
+        click.echo(f"   {docker_status}")
+        
+        # Display forest status
+        forests = status.get('forests', {})
+        click.echo(f"\n🌲 Active Forests: {len(forests)}")
+        
+        if forests:
+            for forest_name, forest_info in forests.items():
+                click.echo(f"\n   Forest: {forest_name}")
+                click.echo(f"     Container ID: {forest_info.get('container_id', 'Unknown')[:12]}")
+                click.echo(f"     Status: {forest_info.get('status', 'Unknown')}")
+                click.echo(f"     Health: {forest_info.get('health', 'Unknown')}")
+        else:
+            click.echo("   No forests currently deployed.")
             
-            if forests:
-                for forest_name, forest_info in forests.items():
-                    click.echo(f"\n   Forest: {forest_name}")
-                    click.echo(f"     Container ID: {forest_info.get('container_id', 'Unknown')[:12]}")
-                    click.echo(f"     Status: {forest_info.get('status', 'Unknown')}")
-                    click.echo(f"     Health: {forest_info.get('health', 'Unknown')}")
-            else:
-                click.echo("   No forests currently deployed.")
-                
-        except Exception as e:
-            click.echo(f"Error reading status: {e}")
-            click.echo("Daemon may not be running. Start with: launchctl start com.ad-setup.enterprise")
-    else:
+    except FileNotFoundError:
         click.echo("❌ No status information available.")
         click.echo("The daemon may not be running.")
         click.echo("\nTo start the daemon:")
         click.echo("  $ launchctl start com.ad-setup.enterprise")
         click.echo("\nTo check daemon logs:")
         click.echo("  $ ad-setup logs --errors")
+    except Exception as e:
+        click.echo(f"Error reading status: {e}")
+        click.echo("Daemon may not be running. Start with: launchctl start com.ad-setup.enterprise")
 
 @cli.command()
 @click.option('--port', default=8080, help='Port to run the web UI on')
@@ -149,23 +154,16 @@ def ui(port, no_browser):
     """Launch the web UI (if available)"""
     click.echo(f"🌐 Starting AD-Setup Web UI on port {port}...")
     
-    # Start the web server in a separate process
-    import subprocess
+    # Run the web server in this process on a background thread
+    import threading
     import webbrowser
-    import time
-    
-    # Get the path to the web_ui.py script
-    web_ui_path = Path(__file__).parent / 'web_ui.py'
+    import web_ui
     
     try:
-        # Start the web server
-        process = subprocess.Popen(
-            [sys.executable, str(web_ui_path)],
-            env={**os.environ, 'AD_SETUP_PORT': str(port)}
-        )
-        
-        # Give the server a moment to start
-        time.sleep(1)
+        # The socket is bound and listening as soon as the server is created
+        httpd = web_ui.create_server(port)
+        server_thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        server_thread.start()
         
         # Open browser unless disabled
         if not no_browser:
@@ -175,13 +173,14 @@ def ui(port, no_browser):
         click.echo(f"\n✨ Web UI is running at: http://localhost:{port}")
         click.echo("Press Ctrl+C to stop the server")
         
-        # Wait for the process
-        process.wait()
+        # Wait for the server thread
+        server_thread.join()
         
     except KeyboardInterrupt:
         click.echo("\n🛑 Stopping Web UI...")
-        if 'process' in locals():
-            process.terminate()
+        if 'httpd' in locals():
+            httpd.shutdown()
+            httpd.server_close()
     except Exception as e:
         click.echo(f"Error starting web UI: {e}", err=True)
 
@@ -190,31 +189,31 @@ def ui(port, no_browser):
 @click.option('--tail', default=0, help='Show only last N lines')
 def logs(errors, tail):
     """View AD-Setup logs"""
-    if sys.platform == "darwin":
-        log_dir = Path.home() / "Library" / "Logs" / "ad-setup"
-    else:
-        log_dir = Path("/var/log/ad-setup")
+    log_dir = fs_utils.LOG_DIR
     
     # Determine which log file to show
     if errors:
-        log_file = log_dir / "ad-setup-error.log"
+        log_file = os.path.join(log_dir, "ad-setup-error.log")
         log_type = "Error"
     else:
-        log_file = log_dir / "ad-setup.log"
+        log_file = os.path.join(log_dir, "ad-setup.log")
         log_type = "Application"
     
-    if log_file.exists():
+    try:
+        if tail > 0:
+            content = log_utils.tail(log_file, tail)
+        else:
+            with open(log_file, 'r') as f:
+                content = f.read()
+    except FileNotFoundError:
+        content = None
+    
+    if content is not None:
         click.echo(f"📄 {log_type} logs from: {log_file}")
         click.echo("=" * 60)
         
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
-            
-        if tail > 0:
-            lines = lines[-tail:]
-        
-        if lines:
-            click.echo(''.join(lines))
+        if content:
+            click.echo(content)
         else:
             click.echo(f"No entries in {log_type.lower()} log.")
     else:
@@ -225,12 +224,12 @@ def logs(errors, tail):
     click.echo("📊 Log Summary:")
     
     for filename in ['ad-setup.log', 'ad-setup-error.log']:
-        filepath = log_dir / filename
-        if filepath.exists():
-            size = filepath.stat().st_size
+        filepath = os.path.join(log_dir, filename)
+        st = fs_utils.safe_stat(filepath)
+        if st is not None:
+            size = st.st_size
             if size > 0:
-                with open(filepath, 'r') as f:
-                    line_count = sum(1 for _ in f)
+                line_count = log_utils.count_lines(filepath)
                 click.echo(f"  • {filename}: {line_count} lines ({size} bytes)")
             else:
                 click.echo(f"  • {filename}: Empty")
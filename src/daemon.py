@@ -9,31 +9,43 @@ import sys
 import time
 import signal
 import logging
-import yaml
-import json
+import logging.handlers
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any
 import threading
 
+import fs_utils
+import json_utils
+import yaml_utils
+
+_CONFIG_FILE = Path.home() / ".config" / "ad-setup" / "config.yaml"
+
 # Setup logging
 def setup_logging():
     """Configure logging for the daemon"""
+    fs_utils.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    
     if sys.platform == "darwin":
-        log_dir = Path.home() / "Library" / "Logs" / "ad-setup"
+        # No logrotate on macOS; keep roughly 1MB plus one backup
+        handlers = [logging.handlers.RotatingFileHandler(
+            fs_utils.LOG_FILE, maxBytes=1024 * 1024, backupCount=1
+        )]
     else:
-        log_dir = Path("/var/log/ad-setup")
+        # logrotate owns rotation (see install.sh); reopen the file after it moves
+        handlers = [logging.handlers.WatchedFileHandler(fs_utils.LOG_FILE)]
     
-    log_dir.mkdir(parents=True, exist_ok=True)
+    # Under launchd/systemd stdout is appended to this same log file, so only
+    # echo to it when run interactively; otherwise every record lands twice and
+    # rotation leaves the service manager's fd on the renamed backup
+    if sys.stdout.isatty():
+        handlers.append(logging.StreamHandler(sys.stdout))
     
     # Configure main logger
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / "ad-setup.log"),
-            logging.StreamHandler(sys.stdout)
-        ]
+        handlers=handlers
     )
     
     return logging.getLogger(__name__)
@@ -44,8 +56,12 @@ class ADSetupDaemon:
     def __init__(self):
         self.logger = setup_logging()
         self.running = False
+        # Set to cut the sleep between health checks short
+        self._wakeup = threading.Event()
         self.config = self.load_config()
         self.forests = {}
+        self._docker = None
+        self._docker_ok = False
         self.metrics = {
             'uptime': 0,
             'forests_monitored': 0,
@@ -55,14 +71,12 @@ class ADSetupDaemon:
         
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
-        config_path = Path.home() / ".config" / "ad-setup" / "config.yaml"
-        
-        if config_path.exists():
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
+        try:
+            with open(_CONFIG_FILE, 'r') as f:
+                config = yaml_utils.load(f)
                 self.logger.info("Configuration loaded successfully")
                 return config
-        else:
+        except FileNotFoundError:
             self.logger.warning("No configuration file found, using defaults")
             return {
                 'general': {
@@ -78,37 +92,43 @@ class ADSetupDaemon:
         """Handle shutdown signals gracefully"""
         self.logger.info(f"Received signal {signum}, shutting down...")
         self.running = False
+        self._wakeup.set()
     
-    def check_docker_status(self) -> bool:
-        """Check if Docker is running"""
-        try:
+    def recheck_handler(self, signum, frame):
+        """Handle SIGUSR1 by running the next health check immediately"""
+        self.logger.info(f"Received signal {signum}, running health check now")
+        self._wakeup.set()
+    
+    def _docker_client(self):
+        """Return a cached Docker client, connecting on first use"""
+        if self._docker is None:
             import docker
-            client = docker.from_env()
-            client.ping()
-            return True
-        except Exception as e:
-            self.logger.error(f"Docker check failed: {e}")
-            return False
+            self._docker = docker.from_env()
+        return self._docker
     
     def monitor_forests(self):
-        """Monitor active AD forests"""
+        """Monitor active AD forests and record whether Docker is reachable"""
         try:
-            import docker
-            client = docker.from_env()
+            client = self._docker_client()
             
-            # Look for AD containers
-            containers = client.containers.list(
+            # Look for AD containers; the low-level listing returns summaries
+            # in one call, where containers.list() inspects each container
+            containers = client.api.containers(
                 filters={"label": "ad-setup.forest"}
             )
+            # A successful listing doubles as the Docker liveness check
+            self._docker_ok = True
             
             self.forests = {}
             for container in containers:
-                forest_name = container.labels.get("ad-setup.forest.name", "unknown")
+                labels = container.get('Labels') or {}
+                forest_name = labels.get("ad-setup.forest.name", "unknown")
+                state = container.get('State', 'unknown')
                 self.forests[forest_name] = {
-                    'container_id': container.id,
-                    'status': container.status,
-                    'started': container.attrs['State']['StartedAt'],
-                    'health': 'healthy' if container.status == 'running' else 'unhealthy'
+                    'container_id': container['Id'],
+                    'status': state,
+                    'created': datetime.fromtimestamp(container['Created'], tz=timezone.utc).isoformat(),
+                    'health': 'healthy' if state == 'running' else 'unhealthy'
                 }
             
             self.metrics['forests_monitored'] = len(self.forests)
@@ -116,6 +136,9 @@ class ADSetupDaemon:
             
         except Exception as e:
             self.logger.error(f"Forest monitoring error: {e}")
+            # Treat Docker as down and reconnect on the next cycle
+            self._docker_ok = False
+            self._docker = None
     
     def perform_health_check(self):
         """Perform health checks on all components"""
@@ -123,7 +146,7 @@ class ADSetupDaemon:
         
         health_status = {
             'timestamp': datetime.now().isoformat(),
-            'docker': self.check_docker_status(),
+            'docker': self._docker_ok,
             'forests': self.forests,
             'daemon': {
                 'uptime': self.metrics['uptime'],
@@ -133,11 +156,12 @@ class ADSetupDaemon:
         }
         
         # Write health status to file
-        status_file = Path.home() / ".ad-setup" / "status.json"
-        status_file.parent.mkdir(parents=True, exist_ok=True)
+        fs_utils.STATUS_FILE.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(status_file, 'w') as f:
-            json.dump(health_status, f, indent=2)
+        # Write to a sibling temp file and rename so readers never see partial JSON
+        tmp_file = fs_utils.STATUS_FILE.with_suffix('.json.tmp')
+        tmp_file.write_bytes(json_utils.dumps(health_status))
+        os.replace(tmp_file, fs_utils.STATUS_FILE)
         
         self.metrics['health_checks'] += 1
         self.metrics['last_check'] = datetime.now().isoformat()
@@ -148,26 +172,6 @@ class ADSetupDaemon:
         else:
             self.logger.warning("Health check completed: Docker ✗")
     
-    def cleanup_logs(self):
-        """Rotate and cleanup old logs"""
-        try:
-            if sys.platform == "darwin":
-                log_dir = Path.home() / "Library" / "Logs" / "ad-setup"
-            else:
-                log_dir = Path("/var/log/ad-setup")
-            
-            # Simple log rotation - keep only last 1MB
-            log_file = log_dir / "ad-setup.log"
-            if log_file.exists() and log_file.stat().st_size > 1024 * 1024:  # 1MB
-                backup_file = log_dir / "ad-setup.log.old"
-                if backup_file.exists():
-                    backup_file.unlink()
-                log_file.rename(backup_file)
-                self.logger.info("Log file rotated")
-                
-        except Exception as e:
-            self.logger.error(f"Log cleanup error: {e}")
-    
     def run(self):
         """Main daemon loop"""
         self.logger.info("AD-Setup Daemon starting...")
@@ -176,17 +180,23 @@ class ADSetupDaemon:
         # Set up signal handlers
         signal.signal(signal.SIGTERM, self.signal_handler)
         signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGUSR1, self.recheck_handler)
         
         self.running = True
         start_time = time.time()
         
-        # Initial checks
-        self.perform_health_check()
+        # Initial checks (forests first so the health check sees Docker state)
         self.monitor_forests()
+        self.perform_health_check()
         
         check_interval = self.config.get('general', {}).get('health_check_interval', 60)
         
         while self.running:
+            # Clear before checking so a nudge during the check wakes the next sleep
+            self._wakeup.clear()
+            # A shutdown signal may have landed just before the clear
+            if not self.running:
+                break
             try:
                 # Update uptime
                 self.metrics['uptime'] = int(time.time() - start_time)
@@ -195,17 +205,13 @@ class ADSetupDaemon:
                 self.monitor_forests()
                 self.perform_health_check()
                 
-                # Cleanup logs occasionally
-                if self.metrics['health_checks'] % 100 == 0:
-                    self.cleanup_logs()
-                
-                # Sleep until next check
+                # Sleep until next check, a shutdown signal or a SIGUSR1 nudge
                 self.logger.debug(f"Sleeping for {check_interval} seconds...")
-                time.sleep(check_interval)
+                self._wakeup.wait(check_interval)
                 
             except Exception as e:
                 self.logger.error(f"Daemon error: {e}", exc_info=True)
-                time.sleep(10)  # Brief pause on error
+                self._wakeup.wait(10)  # Brief pause on error
         
         self.logger.info("AD-Setup Daemon stopped")
 
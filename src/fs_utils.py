@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+AD-Setup Enterprise filesystem helpers
+Small wrappers around os calls shared by the CLI, daemon and web UI
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# File locations shared by the CLI, daemon and web UI
+if sys.platform == "darwin":
+    LOG_DIR = Path.home() / "Library" / "Logs" / "ad-setup"
+else:
+    LOG_DIR = Path("/var/log/ad-setup")
+LOG_FILE = LOG_DIR / "ad-setup.log"
+STATUS_FILE = Path.home() / ".ad-setup" / "status.json"
+
+def safe_stat(path):
+    """Return os.stat() for path, or None if it does not exist"""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
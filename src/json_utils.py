@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+AD-Setup Enterprise JSON helpers
+Shared JSON encode/decode using orjson when available
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dumps(data) -> bytes:
+    """Serialize data to compact UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+AD-Setup Enterprise log helpers
+Shared helpers for reading AD-Setup log files
+"""
+
+import mmap
+import os
+
+def tail(path, n: int) -> str:
+    """Return the last n lines of a file without reading all of it"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        
+        # Search the page cache backwards for the start of the last n lines
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            # A trailing newline ends the last line rather than starting a new one
+            if mm[end - 1:end] == b'\n':
+                end -= 1
+            pos = end
+            for _ in range(n):
+                pos = mm.rfind(b'\n', 0, pos)
+                if pos < 0:
+                    break
+            data = mm[pos + 1:end]
+
+    return data.decode('utf-8', errors='replace')
+
+def count_lines(path) -> int:
+    """Count the lines in a file by scanning raw bytes for newlines"""
+    count = 0
+    last = b''
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            count += chunk.count(b'\n')
+            last = chunk
+    # A final line without a trailing newline still counts
+    if last and not last.endswith(b'\n'):
+        count += 1
+    return count
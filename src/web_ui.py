@@ -4,37 +4,25 @@ AD-Setup Enterprise Web UI
 Simple web interface for AD forest management
 """
 
-import json
+import hashlib
 import os
-import sys
-from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse
 import logging
 
+import fs_utils
+import json_utils
+import log_utils
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class ADSetupWebHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for AD-Setup Web UI"""
-    
-    def do_GET(self):
-        """Handle GET requests"""
-        path = urlparse(self.path).path
-        
-        if path == '/':
-            self.serve_homepage()
-        elif path == '/api/status':
-            self.serve_status()
-        elif path == '/api/logs':
-            self.serve_logs()
-        else:
-            self.send_error(404, "Page not found")
-    
-    def serve_homepage(self):
-        """Serve the main web UI page"""
-        html = """
+# Last parsed status.json as (mtime_ns, data), replaced as a whole
+_status_cache = (0, None)
+
+# Main web UI page
+_HOMEPAGE_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -192,16 +180,50 @@ class ADSetupWebHandler(BaseHTTPRequestHandler):
     </script>
 </body>
 </html>
-        """
+"""
+
+# Static page, encoded once at import
+_HOMEPAGE_BYTES = _HOMEPAGE_HTML.encode('utf-8')
+_HOMEPAGE_LEN = str(len(_HOMEPAGE_BYTES))
+_HOMEPAGE_ETAG = f'"{hashlib.md5(_HOMEPAGE_BYTES, usedforsecurity=False).hexdigest()}"'
+_HOMEPAGE_CACHE_HEADERS = {'ETag': _HOMEPAGE_ETAG, 'Cache-Control': 'public, max-age=300'}
+
+class ADSetupWebHandler(BaseHTTPRequestHandler):
+    """HTTP request handler for AD-Setup Web UI"""
+    
+    # Keep connections open between status and log polls
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        """Handle GET requests"""
+        path = urlparse(self.path).path
+        
+        if path == '/':
+            self.serve_homepage()
+        elif path == '/api/status':
+            self.serve_status()
+        elif path == '/api/logs':
+            self.serve_logs()
+        else:
+            self.send_error(404, "Page not found")
+    
+    def serve_homepage(self):
+        """Serve the main web UI page"""
+        if self.headers.get('If-None-Match') == _HOMEPAGE_ETAG:
+            self.send_not_modified(_HOMEPAGE_CACHE_HEADERS)
+            return
         
         self.send_response(200)
         self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', _HOMEPAGE_LEN)
+        for name, value in _HOMEPAGE_CACHE_HEADERS.items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(html.encode())
+        self.wfile.write(_HOMEPAGE_BYTES)
     
     def serve_status(self):
         """Serve status information as JSON"""
-        status_file = Path.home() / ".ad-setup" / "status.json"
+        global _status_cache
         
         response_data = {
             'daemon': False,
@@ -210,53 +232,75 @@ class ADSetupWebHandler(BaseHTTPRequestHandler):
             'forests': {}
         }
         
-        if status_file.exists():
+        headers = {}
+        st = fs_utils.safe_stat(fs_utils.STATUS_FILE)
+        if st is not None:
+            # status.json is the only input, so its mtime identifies the response
+            etag = f'"{st.st_mtime_ns:x}"'
+            # Make browsers revalidate each poll instead of reusing a cached copy
+            cache_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+            if self.headers.get('If-None-Match') == etag:
+                self.send_not_modified(cache_headers)
+                return
             try:
-                with open(status_file, 'r') as f:
-                    status = json.load(f)
-                    response_data['daemon'] = status.get('daemon')
-                    response_data['docker'] = status.get('docker', False)
-                    response_data['forests'] = status.get('forests', {})
-                    response_data['forest_count'] = len(response_data['forests'])
+                cached_mtime, status = _status_cache
+                if st.st_mtime_ns != cached_mtime:
+                    status = json_utils.loads(fs_utils.STATUS_FILE.read_bytes())
+                    _status_cache = (st.st_mtime_ns, status)
+                response_data['daemon'] = status.get('daemon')
+                response_data['docker'] = status.get('docker', False)
+                response_data['forests'] = status.get('forests', {})
+                response_data['forest_count'] = len(response_data['forests'])
+                headers = cache_headers
             except Exception as e:
                 logger.error(f"Error reading status: {e}")
         
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(response_data).encode())
+        self.send_json(response_data, headers)
     
     def serve_logs(self):
         """Serve recent log entries"""
-        if sys.platform == "darwin":
-            log_file = Path.home() / "Library" / "Logs" / "ad-setup" / "ad-setup.log"
-        else:
-            log_file = Path("/var/log/ad-setup/ad-setup.log")
-        
         logs = "No logs available"
         
-        if log_file.exists():
-            try:
-                with open(log_file, 'r') as f:
-                    lines = f.readlines()
-                    # Get last 50 lines
-                    logs = ''.join(lines[-50:])
-            except Exception as e:
-                logs = f"Error reading logs: {e}"
+        try:
+            # Get last 50 lines
+            logs = log_utils.tail(fs_utils.LOG_FILE, 50)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logs = f"Error reading logs: {e}"
         
+        self.send_json({'logs': logs})
+    
+    def send_json(self, data, headers=None):
+        """Send a JSON response with an explicit Content-Length"""
+        body = json_utils.dumps(data)
         self.send_response(200)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_not_modified(self, headers):
+        """Send a bodyless 304 repeating the 200's ETag and caching headers"""
+        self.send_response(304)
+        for name, value in headers.items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(json.dumps({'logs': logs}).encode())
     
     def log_message(self, format, *args):
         """Override to suppress request logging"""
         return
 
+def create_server(port=8080):
+    """Create the web UI server; it is listening once this returns"""
+    server_address = ('', port)
+    return ThreadingHTTPServer(server_address, ADSetupWebHandler)
+
 def run_server(port=8080):
     """Run the web UI server"""
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, ADSetupWebHandler)
+    httpd = create_server(port)
     
     logger.info(f"AD-Setup Web UI running on http://localhost:{port}")
     logger.info("Press Ctrl+C to stop")
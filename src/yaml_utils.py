@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+AD-Setup Enterprise YAML helpers
+Shared YAML load/dump using the libyaml C bindings when available
+"""
+
+import yaml
+
+# Prefer the C-backed loader/dumper, fall back to pure Python
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+SafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+def load(stream):
+    """Safely parse a YAML document from a string or open file"""
+    return yaml.load(stream, Loader=SafeLoader)
+
+def dump(data, stream=None):
+    """Safely serialize data as YAML to an open file (or return a string)"""
+    return yaml.dump(data, stream, Dumper=SafeDumper)